@@ -4,12 +4,13 @@ Handles real-time transaction notifications and stores them in the database.
 """
 
 from fastapi import FastAPI, Request, HTTPException, Header, Depends, BackgroundTasks, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+import asyncio
 import uuid
-import re
 import os
 import shutil
 import db
@@ -59,6 +60,12 @@ VALID_PASSWORD = None
 EXPECTED_CHANNEL_TYPE = "MBL"
 EXPECTED_CHANNEL_SUBTYPE = "CMS"
 
+# Characters removed from amounts before parsing, e.g. "560,000.00"
+AMOUNT_STRIP_TABLE = str.maketrans("", "", ", ")
+
+# Chunk size used when streaming uploaded evidence files to disk
+UPLOAD_COPY_CHUNK_SIZE = 1024 * 1024
+
 # IP Whitelist - loaded from environment variable (comma-separated)
 ALLOWED_IPS_STR = os.getenv("ALLOWED_IPS", "127.0.0.1,::1")
 ALLOWED_IPS = [ip.strip() for ip in ALLOWED_IPS_STR.split(",") if ip.strip()]
@@ -102,6 +109,21 @@ class ErrorResponse(BaseModel):
     stan: Optional[str] = None
 
 
+def get_missing_env_vars() -> list:
+    """
+    Return the names of required security environment variables that are not set.
+    
+    Returns:
+        List of missing variable names (empty if fully configured)
+    """
+    required = {
+        "AUTHORIZATION_TOKEN": AUTHORIZATION_TOKEN,
+        "VALID_USER_ID": VALID_USER_ID,
+        "VALID_PASSWORD": VALID_PASSWORD,
+    }
+    return [name for name, value in required.items() if not value]
+
+
 def verify_bearer_token(authorization: Optional[str] = Header(None)) -> bool:
     """
     Verify the Bearer token from Authorization header.
@@ -247,7 +269,7 @@ def parse_message_data(message_data: str) -> dict:
         if credit_str:
             try:
                 # Remove any currency symbols, spaces, commas
-                cleaned = credit_str.replace(",", "").replace(" ", "").strip()
+                cleaned = credit_str.translate(AMOUNT_STRIP_TABLE).strip()
                 credit = float(cleaned)
             except (ValueError, AttributeError):
                 credit = None
@@ -329,6 +351,11 @@ def parse_transaction_datetime(datetime_str: Optional[str]) -> Optional[str]:
     if has_z_suffix:
         datetime_str = f"{datetime_str}Z"
     
+    # Fast path: ISO-shaped input is validated with a single strptime call
+    normalized = db.normalize_iso_date(datetime_str)
+    if normalized:
+        return normalized if len(normalized) > 10 else f"{normalized} 00:00:00"
+    
     # Try common datetime formats
     formats_to_try = [
         "%Y-%m-%dT%H:%M:%S",           # ISO without timezone: 2025-10-02T18:08:54
@@ -357,7 +384,7 @@ def parse_transaction_datetime(datetime_str: Optional[str]) -> Optional[str]:
     # This handles cases like "02-OCT-25,180854" (date and time separated)
     try:
         # Try splitting by comma or space
-        parts = re.split(r'[,\s]+', datetime_str)
+        parts = db.DATE_TIME_SPLIT_RE.split(datetime_str)
         if len(parts) >= 2:
             date_part = parts[0]
             time_part = parts[1]
@@ -452,6 +479,27 @@ def process_transaction(host_data: HostData, transaction_datetime: Optional[str]
         print(f"[Background Task] Traceback: {traceback.format_exc()}")
 
 
+def doc_id_stan_lookup(doc_id: str) -> Optional[tuple]:
+    """
+    Look up the STAN stored for an already-received doc_id.
+    
+    Args:
+        doc_id: Document ID from the bank alert
+        
+    Returns:
+        The (stan,) row if the doc_id exists. None if not, or if the check
+        itself fails (a failed check never blocks an alert).
+    """
+    try:
+        with db.pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT stan FROM bank_transactions WHERE doc_id = %s", (doc_id,))
+            return cursor.fetchone()
+    except Exception:
+        # If check fails, continue processing (don't block on check error)
+        return None
+
+
 @app.post("/meezan-alert", response_model=SuccessResponse)
 async def meezan_alert(
     request_body: MeezanAlertRequest,
@@ -534,36 +582,25 @@ async def meezan_alert(
         # Extract doc_id for duplicate check
         input_id = request_body.hostData.id
         
-        # Check for duplicate doc_id immediately after auth (synchronous check)
-        conn = None
-        try:
-            conn = db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT stan FROM bank_transactions WHERE doc_id = %s", (input_id,))
-            existing_record = cursor.fetchone()
-            
-            if existing_record:
-                # Duplicate found - return existing STAN immediately
-                existing_stan = existing_record[0]
-                # If STAN is None or empty, generate a new one (shouldn't happen, but handle edge case)
-                if not existing_stan:
-                    existing_stan = str(uuid.uuid4())
-                conn.close()
-                return JSONResponse(
-                    status_code=200,
-                    content={
-                        "statusCode": "01",
-                        "statusDesc": "fail",
-                        "id": input_id,
-                        "stan": existing_stan
-                    }
-                )
-            conn.close()
-        except Exception as e:
-            if conn:
-                conn.close()
-            # If check fails, continue processing (don't block on check error)
-            pass
+        # Check for duplicate doc_id immediately after auth (awaited before responding).
+        # Runs in the threadpool so waiting on the database never blocks the event loop
+        existing_record = await run_in_threadpool(doc_id_stan_lookup, input_id)
+        
+        if existing_record:
+            # Duplicate found - return existing STAN immediately
+            existing_stan = existing_record[0]
+            # If STAN is None or empty, generate a new one (shouldn't happen, but handle edge case)
+            if not existing_stan:
+                existing_stan = str(uuid.uuid4())
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "statusCode": "01",
+                    "statusDesc": "fail",
+                    "id": input_id,
+                    "stan": existing_stan
+                }
+            )
         
         # No duplicate found - generate new STAN and queue for processing
         stan = str(uuid.uuid4())
@@ -614,6 +651,33 @@ async def meezan_alert(
         )
 
 
+def donation_id_exists(donation_id: str) -> bool:
+    """
+    Check whether a screenshot record with this donation_id already exists.
+    
+    Args:
+        donation_id: Donation ID to look up
+        
+    Returns:
+        True if a record exists. False if not, or if the check itself fails
+        (a failed check never blocks an upload).
+    """
+    try:
+        with db.pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM screenshots WHERE donation_id = %s", (donation_id,))
+            return cursor.fetchone() is not None
+    except Exception as e:
+        print(f"Error checking duplicate donation_id: {str(e)}")
+        return False
+
+
+def save_upload_to_disk(source, file_path: str) -> None:
+    """Stream an uploaded file object to disk in UPLOAD_COPY_CHUNK_SIZE chunks."""
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer, length=UPLOAD_COPY_CHUNK_SIZE)
+
+
 @app.post("/upload-evidence")
 async def upload_evidence(
     file: UploadFile = File(..., description="Evidence file to upload (JPEG/PNG/PDF)"),
@@ -636,29 +700,6 @@ async def upload_evidence(
     - 400 Bad Request if donation_id already exists
     """
     try:
-        # Check if donation_id already exists in database
-        conn = db.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM screenshots WHERE donation_id = %s", (donation_id,))
-            existing_record = cursor.fetchone()
-            conn.close()
-            
-            if existing_record:
-                # Duplicate found - return 200 OK with error message
-                return JSONResponse(
-                    status_code=200,
-                    content={
-                        "status": "error",
-                        "message": f"donation_id '{donation_id}' already exists"
-                    }
-                )
-        except Exception as e:
-            if conn:
-                conn.close()
-            # If check fails, continue processing (don't block on check error)
-            print(f"Error checking duplicate donation_id: {str(e)}")
-        
         # Create uploads directory if it doesn't exist
         uploads_dir = "uploads"
         os.makedirs(uploads_dir, exist_ok=True)
@@ -668,15 +709,31 @@ async def upload_evidence(
         secure_filename = f"{donation_id}_{uuid.uuid4().hex}{file_extension}"
         file_path = os.path.join(uploads_dir, secure_filename)
         
-        # Save file to disk
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Check for a duplicate donation_id (database) while streaming the file
+        # to disk; both run in the threadpool so the event loop is never blocked
+        await file.seek(0)
+        is_duplicate, _ = await asyncio.gather(
+            run_in_threadpool(donation_id_exists, donation_id),
+            run_in_threadpool(save_upload_to_disk, file.file, file_path),
+        )
+        
+        if is_duplicate:
+            # Duplicate found - discard the saved file and return 200 OK with error message
+            os.remove(file_path)
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "status": "error",
+                    "message": f"donation_id '{donation_id}' already exists"
+                }
+            )
         
         # Get absolute path for database storage
         absolute_file_path = os.path.abspath(file_path)
         
         # Insert record into database (only donation_id and file_path)
-        success, error_msg, screenshot_id = db.insert_screenshot_inbox(
+        success, error_msg, screenshot_id = await run_in_threadpool(
+            db.insert_screenshot_inbox,
             donation_id=donation_id,
             file_path=absolute_file_path
         )
@@ -733,13 +790,7 @@ async def health_check():
         }
         
         # Check if required environment variables are set
-        missing_vars = []
-        if not AUTHORIZATION_TOKEN:
-            missing_vars.append("AUTHORIZATION_TOKEN")
-        if not VALID_USER_ID:
-            missing_vars.append("VALID_USER_ID")
-        if not VALID_PASSWORD:
-            missing_vars.append("VALID_PASSWORD")
+        missing_vars = get_missing_env_vars()
         
         if missing_vars:
             health_status["configured"] = False
@@ -793,13 +844,7 @@ async def startup_event():
     VALID_PASSWORD = os.getenv("VALID_PASSWORD")
     
     # Validate required environment variables
-    missing_vars = []
-    if not AUTHORIZATION_TOKEN:
-        missing_vars.append("AUTHORIZATION_TOKEN")
-    if not VALID_USER_ID:
-        missing_vars.append("VALID_USER_ID")
-    if not VALID_PASSWORD:
-        missing_vars.append("VALID_PASSWORD")
+    missing_vars = get_missing_env_vars()
     
     if missing_vars:
         error_msg = f"[Startup] ❌ ERROR: Missing required environment variables: {', '.join(missing_vars)}"
@@ -824,11 +869,8 @@ async def startup_event():
     if database_url and "postgres.railway.internal" not in database_url:
         try:
             print("[Startup] Testing database connection...", flush=True)
-            conn = db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
-            conn.close()
+            # Opens the pool's idle connections (POSTGRES_POOL_MIN_SIZE), so the first request doesn't pay for them
+            await run_in_threadpool(db.warmup)
             print("[Startup] ✅ Database connection successful", flush=True)
         except Exception as e:
             error_msg = str(e)
@@ -847,7 +889,7 @@ async def startup_event():
     if auto_init:
         try:
             print("[Startup] Auto-initializing database schema...", flush=True)
-            db.initialize_schema()
+            await db.initialize_schema_async()
             print("[Startup] ✅ Database schema initialized successfully", flush=True)
         except Exception as e:
             print(f"[Startup] ⚠️  Warning: Failed to auto-initialize database schema: {e}", flush=True)
@@ -3,18 +3,77 @@ Database module for handling all database operations.
 Provides functions for connecting, querying, and managing database records.
 """
 
+import asyncio
+import io
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+from psycopg2 import sql
 import pandas as pd
 import re
 import os
+import threading
+import time
+from contextlib import contextmanager, ExitStack
+from pathlib import Path
 from urllib.parse import urlparse
 from datetime import datetime
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Tuple, Dict, Any, List, Iterator, Iterable, Sequence
+
+
+# Shared connection pool, created lazily on first use so importing this
+# module never opens a connection (and .env can be loaded beforehand)
+_pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+_pool_slots: Optional[threading.BoundedSemaphore] = None
+_pool_max_lifetime = 0.0
+_pool_timeout = 0.0
+_pool_ping_idle = 0.0
+_pool_created = 0.0
+_pool_connection_born: Dict[int, float] = {}
+_pool_connection_idle_since: Dict[int, float] = {}
 
 
 # Database configuration
 SYNC_KEY = "bank_transactions_last_sync"
 
+# Set once sync_metadata is known to exist, so the sync-time helpers skip
+# the CREATE TABLE IF NOT EXISTS round-trip on every call
+_sync_metadata_ready = False
+
+# ISO-shaped dates: "YYYY-MM-DD", "YYYY-MM-DD HH:MM:SS" and
+# "YYYY-MM-DDTHH:MM:SS[.ffffff][Z]"
+_ISO_DATE_RE = re.compile(
+    r"(\d{4}-\d{2}-\d{2})(?:T(\d{2}:\d{2}:\d{2})(?:\.\d{1,6})?Z?| (\d{2}:\d{2}:\d{2}))?",
+    re.ASCII,
+)
+
+# Separator between date and time parts, e.g. "30-Sep-25,193422"
+DATE_TIME_SPLIT_RE = re.compile(r"[,\s]+")
+
+
+def normalize_iso_date(date_str: str) -> Optional[str]:
+    """
+    Fast path for ISO-shaped date strings, the common case for bank APIs.
+    
+    Returns the normalized string, or None if the input is not ISO-shaped
+    or is not a valid date (callers then fall back to the full format sweep).
+    """
+    match = _ISO_DATE_RE.fullmatch(date_str)
+    if not match:
+        return None
+    
+    date_part, iso_time, plain_time = match.groups()
+    time_part = iso_time or plain_time
+    try:
+        if time_part:
+            parsed_dt = datetime.strptime(f"{date_part} {time_part}", "%Y-%m-%d %H:%M:%S")
+            return parsed_dt.strftime("%Y-%m-%d %H:%M:%S")
+        parsed_dt = datetime.strptime(date_part, "%Y-%m-%d")
+        return parsed_dt.strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
 
 def normalize_date_to_db_format(date_str: Optional[str]) -> Optional[str]:
     """
@@ -46,6 +105,11 @@ def normalize_date_to_db_format(date_str: Optional[str]) -> Optional[str]:
     if not date_str or date_str.lower() in ['none', 'null', '']:
         return None
     
+    # Most inputs are already ISO-shaped; skip the format sweep for them
+    normalized = normalize_iso_date(date_str)
+    if normalized:
+        return normalized
+    
     # Month abbreviation mapping
     month_map = {
         "JAN": "01", "FEB": "02", "MAR": "03", "APR": "04",
@@ -97,7 +161,7 @@ def normalize_date_to_db_format(date_str: Optional[str]) -> Optional[str]:
     
     # Try manual parsing for DD-MMM-YY format with time (e.g., "30-Sep-25,193422")
     try:
-        parts = re.split(r'[,\s]+', date_str)
+        parts = DATE_TIME_SPLIT_RE.split(date_str)
         if len(parts) >= 2:
             date_part = parts[0]
             time_part = parts[1]
@@ -133,14 +197,27 @@ def normalize_date_to_db_format(date_str: Optional[str]) -> Optional[str]:
     return None
 
 
-def get_connection():
+def _normalize_dates_batch(values: List[Any]) -> List[Any]:
     """
-    Get a connection to the PostgreSQL database.
-    Uses DATABASE_URL environment variable if available (for Railway),
-    otherwise falls back to local connection parameters.
+    Normalize a column of date values with normalize_date_to_db_format().
     
-    Returns:
-        psycopg2.connection: Database connection object
+    Each distinct value is parsed only once, since bulk imports typically
+    repeat a small set of dates across many rows. Values that cannot be
+    parsed are kept unchanged so no source data is lost.
+    """
+    normalized_by_value: Dict[Any, Any] = {}
+    for value in values:
+        if value not in normalized_by_value:
+            normalized_by_value[value] = normalize_date_to_db_format(value) or value
+    return [normalized_by_value[value] for value in values]
+
+
+def _connection_params() -> Dict[str, Any]:
+    """
+    Build psycopg2.connect() keyword arguments from environment variables.
+    Uses DATABASE_URL if available (for Railway), otherwise falls back to
+    local connection parameters. POSTGRES_CONNECT_TIMEOUT (seconds) is
+    honored if set.
     """
     database_url = os.getenv("DATABASE_URL")
     
@@ -153,35 +230,179 @@ def get_connection():
         if parsed.scheme == "postgres":
             database_url = database_url.replace("postgres://", "postgresql://", 1)
         
-        return psycopg2.connect(database_url)
+        params: Dict[str, Any] = {"dsn": database_url}
     else:
         # Local development fallback
         # You can set these as environment variables or modify as needed
-        return psycopg2.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            port=os.getenv("DB_PORT", "5432"),
-            database=os.getenv("DB_NAME", "alkhidmat"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD", "")
+        params = {
+            "host": os.getenv("DB_HOST", "localhost"),
+            "port": os.getenv("DB_PORT", "5432"),
+            "database": os.getenv("DB_NAME", "alkhidmat"),
+            "user": os.getenv("DB_USER", "postgres"),
+            "password": os.getenv("DB_PASSWORD", ""),
+        }
+    
+    connect_timeout = os.getenv("POSTGRES_CONNECT_TIMEOUT")
+    if connect_timeout:
+        params["connect_timeout"] = int(connect_timeout)
+    
+    return params
+
+
+def get_connection():
+    """
+    Get a new connection to the PostgreSQL database.
+    The caller owns the connection and must close it.
+    
+    Returns:
+        psycopg2.connection: Database connection object
+    """
+    return psycopg2.connect(**_connection_params())
+
+
+def _get_pool() -> psycopg2.pool.ThreadedConnectionPool:
+    """
+    Return the shared connection pool, creating it on first use.
+    
+    Pool size and connection lifetime are configurable through
+    POSTGRES_POOL_MAX_SIZE (default: 10), POSTGRES_POOL_MIN_SIZE
+    (default: 1, capped at the max size), POSTGRES_MAX_LIFETIME
+    (seconds, default: 1800; 0 = unlimited), POSTGRES_POOL_TIMEOUT
+    (seconds to wait for a free connection, default: 30) and
+    POSTGRES_POOL_PING_IDLE (seconds a connection may sit idle before it
+    is pinged on checkout, default: 60; 0 = always ping).
+    
+    POSTGRES_POOL_MIN_SIZE connections are opened when the pool is created
+    and are the only ones kept idle between uses: psycopg2 closes any
+    connection returned while that many are already idle, so connections
+    beyond it pay a full connect/close per use.
+    """
+    global _pool, _pool_slots, _pool_max_lifetime, _pool_timeout, _pool_ping_idle, _pool_created
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                max_size = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10"))
+                min_size = min(int(os.getenv("POSTGRES_POOL_MIN_SIZE", "1")), max_size)
+                _pool_max_lifetime = float(os.getenv("POSTGRES_MAX_LIFETIME", "1800") or 0)
+                _pool_timeout = float(os.getenv("POSTGRES_POOL_TIMEOUT", "30") or 30)
+                _pool_ping_idle = float(os.getenv("POSTGRES_POOL_PING_IDLE", "60") or 0)
+                _pool_slots = threading.BoundedSemaphore(max_size)
+                _pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=min_size,
+                    maxconn=max_size,
+                    **_connection_params()
+                )
+                _pool_created = time.monotonic()
+    return _pool
+
+
+def _checkout(connection_pool: psycopg2.pool.ThreadedConnectionPool):
+    """
+    Take a connection from the pool that is known to reach the server.
+    
+    Idle connections can be dropped by a server restart or a proxy idle
+    timeout without the client noticing, so one that has sat idle longer
+    than POSTGRES_POOL_PING_IDLE is pinged first (connections never
+    returned yet count as idle since the pool was created). Dead
+    connections are discarded; once the idle ones are exhausted the pool
+    opens a new connection, whose connect errors propagate.
+    """
+    for _ in range(connection_pool.minconn):
+        conn = connection_pool.getconn()
+        idle_since = _pool_connection_idle_since.pop(id(conn), _pool_created)
+        if time.monotonic() - idle_since < _pool_ping_idle:
+            return conn
+        try:
+            # Left in the open transaction; putconn() rolls it back on return
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            return conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            _pool_connection_born.pop(id(conn), None)
+            connection_pool.putconn(conn, close=True)
+    return connection_pool.getconn()
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a connection from the shared pool for the duration of a `with` block.
+    
+    The connection is returned to the pool (not closed) on exit. Any
+    transaction still open at that point is rolled back by the pool, so
+    callers must commit explicitly. Connections older than
+    POSTGRES_MAX_LIFETIME are closed instead of being reused, and
+    long-idle connections are checked (and replaced if dead) before being
+    handed out. When all
+    connections are in use, callers wait up to POSTGRES_POOL_TIMEOUT
+    seconds for one to be returned.
+    
+    Yields:
+        psycopg2.connection: Database connection object
+    
+    Raises:
+        psycopg2.pool.PoolError: If no connection became free in time
+    """
+    connection_pool = _get_pool()
+    if not _pool_slots.acquire(timeout=_pool_timeout):
+        raise psycopg2.pool.PoolError(
+            f"Timed out after {_pool_timeout:g}s waiting for a free database connection"
         )
+    try:
+        conn = _checkout(connection_pool)
+        born = _pool_connection_born.setdefault(id(conn), time.monotonic())
+        try:
+            yield conn
+        finally:
+            expired = bool(_pool_max_lifetime) and time.monotonic() - born > _pool_max_lifetime
+            connection_pool.putconn(conn, close=expired)
+            # putconn() also closes connections the pool has no idle room
+            # for; forget those too so a reused id() starts a fresh lifetime
+            if conn.closed:
+                _pool_connection_born.pop(id(conn), None)
+            else:
+                _pool_connection_idle_since[id(conn)] = time.monotonic()
+    finally:
+        _pool_slots.release()
+
+
+def warmup(n: int = 1) -> None:
+    """
+    Check out up to `n` idle pooled connections before traffic arrives.
+    
+    Creating the pool already opens POSTGRES_POOL_MIN_SIZE connections, so
+    a first call verifies the server is reachable; later calls rely on the
+    checkout ping to replace connections that have gone dead while idle.
+    All connections are held at once (so `n` distinct connections are
+    used) and then returned to the pool.
+    
+    Args:
+        n: Number of connections to check (capped at POSTGRES_POOL_MIN_SIZE,
+           since connections beyond it are closed when returned)
+    """
+    connection_pool = _get_pool()
+    with ExitStack() as stack:
+        for _ in range(min(n, connection_pool.minconn)):
+            stack.enter_context(pooled_connection())
 
 
 def get_max_gsheet_row() -> Optional[int]:
     """Return the highest gsheet_row currently stored in bank_transactions."""
-    conn = get_connection()
-    try:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT MAX(gsheet_row) FROM bank_transactions")
         row = cursor.fetchone()
         if row and row[0] is not None:
             return int(row[0])
         return None
-    finally:
-        conn.close()
 
 
 def _ensure_sync_metadata_table(conn) -> None:
     """Create sync metadata table if it does not exist (PostgreSQL-compatible)."""
+    global _sync_metadata_ready
+    if _sync_metadata_ready:
+        return
     cursor = conn.cursor()
     cursor.execute(
         """
@@ -193,123 +414,90 @@ def _ensure_sync_metadata_table(conn) -> None:
         """
     )
     conn.commit()
+    _sync_metadata_ready = True
+
 
+# All schema DDL, read once at import and sent to the server as a single batch
+SCHEMA_FILE = Path(__file__).with_name("schema.sql")
+SCHEMA_DDL = SCHEMA_FILE.read_text(encoding="utf-8")
 
-def initialize_schema() -> None:
+
+def initialize_schema(conn=None) -> None:
     """
     Initialize all database tables with PostgreSQL-compatible schema.
     Creates tables if they don't exist with:
     - SERIAL for auto-increment IDs
     - CURRENT_TIMESTAMP for timestamp defaults
     - Proper PostgreSQL data types
+    
+    All statements in schema.sql are sent in one round-trip and
+    committed as a single transaction.
+    
+    Args:
+        conn: Connection to run the DDL on; one is borrowed from the
+              shared pool if omitted
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        
-        # Create sync_metadata table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sync_metadata (
-                key TEXT PRIMARY KEY,
-                value TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        )
-        
-        # Create bank_transactions table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS bank_transactions (
-                id SERIAL PRIMARY KEY,
-                booking_date TEXT,
-                value_date TEXT,
-                doc_id TEXT,
-                stan TEXT,
-                description TEXT,
-                debit NUMERIC(15, 2),
-                credit NUMERIC(15, 2),
-                available_balance NUMERIC(15, 2),
-                gsheet_row INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        )
-        
-        # Create index on doc_id for faster lookups
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_bank_transactions_doc_id 
-            ON bank_transactions(doc_id)
-            """
-        )
-        
-        # Create verification_results table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS verification_results (
-                id SERIAL PRIMARY KEY,
-                amount NUMERIC(15, 2),
-                donor_name TEXT,
-                date TEXT,
-                transaction_id TEXT UNIQUE,
-                status TEXT,
-                department TEXT,
-                currency TEXT,
-                payment_channel TEXT,
-                checks_passed INTEGER,
-                checks_failed INTEGER,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                gsheet_row INTEGER,
-                donation_id TEXT,
-                file_path TEXT
-            )
-            """
-        )
+    with ExitStack() as stack:
+        if conn is None:
+            conn = stack.enter_context(pooled_connection())
+        try:
+            cursor = conn.cursor()
+            cursor.execute(SCHEMA_DDL)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise Exception(f"Error initializing database schema: {str(e)}")
+
+
+async def _wait_async(conn) -> None:
+    """
+    Drive a psycopg2 asynchronous connection until its pending operation completes,
+    yielding to the event loop while waiting on the socket.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
         
-        # Create index on transaction_id for faster lookups
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_verification_results_transaction_id 
-            ON verification_results(transaction_id)
-            """
-        )
+        ready = loop.create_future()
         
-        # Create screenshots table
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS screenshots (
-                id SERIAL PRIMARY KEY,
-                verification_id INTEGER,
-                donation_id TEXT,
-                file_path TEXT,
-                status TEXT,
-                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                gsheet_row INTEGER
-            )
-            """
-        )
-        
-        # Create index on verification_id for faster lookups
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_screenshots_verification_id 
-            ON screenshots(verification_id)
-            """
-        )
+        def _mark_ready() -> None:
+            if not ready.done():
+                ready.set_result(None)
         
-        # Create index on donation_id for faster lookups
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_screenshots_donation_id 
-            ON screenshots(donation_id)
-            """
-        )
-        
-        conn.commit()
+        fd = conn.fileno()
+        if state == psycopg2.extensions.POLL_READ:
+            loop.add_reader(fd, _mark_ready)
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fd)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            loop.add_writer(fd, _mark_ready)
+            try:
+                await ready
+            finally:
+                loop.remove_writer(fd)
+        else:
+            raise psycopg2.OperationalError(f"Unexpected connection poll state: {state}")
+
+
+async def initialize_schema_async() -> None:
+    """
+    Asynchronous variant of initialize_schema() for use inside an event loop.
+    
+    Uses a psycopg2 asynchronous connection so the loop is not blocked while
+    connecting or while the server executes the DDL batch. The batch runs in
+    an explicit transaction, since asynchronous connections are autocommit.
+    """
+    conn = psycopg2.connect(async_=1, **_connection_params())
+    try:
+        await _wait_async(conn)
+        cursor = conn.cursor()
+        cursor.execute(f"BEGIN;\n{SCHEMA_DDL}\nCOMMIT;")
+        await _wait_async(conn)
     except Exception as e:
-        conn.rollback()
         raise Exception(f"Error initializing database schema: {str(e)}")
     finally:
         conn.close()
@@ -317,8 +505,7 @@ def initialize_schema() -> None:
 
 def get_last_sync_time() -> Optional[datetime]:
     """Return last time bank transactions were synced from Google Sheets."""
-    conn = get_connection()
-    try:
+    with pooled_connection() as conn:
         _ensure_sync_metadata_table(conn)
         cursor = conn.cursor()
         cursor.execute("SELECT value FROM sync_metadata WHERE key = %s", (SYNC_KEY,))
@@ -329,14 +516,11 @@ def get_last_sync_time() -> Optional[datetime]:
             except ValueError:
                 return None
         return None
-    finally:
-        conn.close()
 
 
 def update_last_sync_time(timestamp: datetime) -> None:
     """Persist the timestamp of the last successful bank transaction sync."""
-    conn = get_connection()
-    try:
+    with pooled_connection() as conn:
         _ensure_sync_metadata_table(conn)
         cursor = conn.cursor()
         iso_timestamp = timestamp.isoformat()
@@ -351,24 +535,21 @@ def update_last_sync_time(timestamp: datetime) -> None:
             (SYNC_KEY, iso_timestamp, iso_timestamp),
         )
         conn.commit()
-    finally:
-        conn.close()
 
 
 def clear_bank_transactions() -> None:
     """Remove all records from bank_transactions table."""
-    conn = get_connection()
-    try:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM bank_transactions")
         conn.commit()
-    finally:
-        conn.close()
 
 
 def bulk_insert_bank_transactions(records: List[Dict[str, Any]]) -> Tuple[int, Optional[str]]:
     """
     Insert multiple bank transaction rows in a single batch.
+    booking_date and value_date are normalized to database format.
+    Rows are streamed with COPY in one round-trip and committed once.
 
     Args:
         records: List of dictionaries with keys matching table columns
@@ -379,35 +560,97 @@ def bulk_insert_bank_transactions(records: List[Dict[str, Any]]) -> Tuple[int, O
     if not records:
         return 0, None
 
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        insert_sql = """
-            INSERT INTO bank_transactions
-            (booking_date, value_date, doc_id, description, debit, credit, available_balance, gsheet_row)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        data = [
-            (
-                record.get("booking_date"),
-                record.get("value_date"),
-                record.get("doc_id"),
-                record.get("description"),
-                record.get("debit"),
-                record.get("credit"),
-                record.get("available_balance"),
-                record.get("gsheet_row"),
-            )
-            for record in records
-        ]
-        cursor.executemany(insert_sql, data)
-        conn.commit()
-        return cursor.rowcount, None
-    except Exception as exc:
-        conn.rollback()
-        return 0, f"Error inserting bank transactions: {exc}"
-    finally:
-        conn.close()
+    columns = (
+        "booking_date", "value_date", "doc_id", "description",
+        "debit", "credit", "available_balance", "gsheet_row",
+    )
+    booking_dates = _normalize_dates_batch([record.get("booking_date") for record in records])
+    value_dates = _normalize_dates_batch([record.get("value_date") for record in records])
+    rows = (
+        (
+            booking_date,
+            value_date,
+            record.get("doc_id"),
+            record.get("description"),
+            record.get("debit"),
+            record.get("credit"),
+            record.get("available_balance"),
+            record.get("gsheet_row"),
+        )
+        for record, booking_date, value_date in zip(records, booking_dates, value_dates)
+    )
+
+    with pooled_connection() as conn:
+        try:
+            cursor = conn.cursor()
+            inserted = _copy_rows(cursor, "bank_transactions", columns, rows)
+            conn.commit()
+            return inserted, None
+        except Exception as exc:
+            conn.rollback()
+            return 0, f"Error inserting bank transactions: {exc}"
+
+
+# Character escapes for COPY text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """
+    Stream rows into a table with COPY ... FROM STDIN on an existing cursor.
+    None is written as NULL; the caller is responsible for committing.
+    
+    Returns:
+        Number of rows copied
+    """
+    buffer = io.StringIO()
+    row_count = 0
+    for row in rows:
+        buffer.write("\t".join(
+            "\\N" if value is None else str(value).translate(_COPY_ESCAPES)
+            for value in row
+        ))
+        buffer.write("\n")
+        row_count += 1
+    
+    if not row_count:
+        return 0
+    
+    buffer.seek(0)
+    copy_sql = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+    )
+    cursor.copy_expert(copy_sql.as_string(cursor), buffer)
+    return row_count
+
+
+def bulk_load(
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]]
+) -> Tuple[int, Optional[str]]:
+    """
+    Bulk-load rows into a table using PostgreSQL COPY in a single transaction.
+    Use this instead of per-row INSERTs for seed data and large imports.
+    
+    Args:
+        table: Target table name
+        columns: Column names, in the same order as the values in each row
+        rows: Iterable of row value sequences
+        
+    Returns:
+        Tuple of (loaded_rows_count, error_message)
+    """
+    with pooled_connection() as conn:
+        try:
+            cursor = conn.cursor()
+            row_count = _copy_rows(cursor, table, columns, rows)
+            conn.commit()
+            return row_count, None
+        except Exception as exc:
+            conn.rollback()
+            return 0, f"Error bulk loading {table}: {exc}"
 
 
 def insert_webhook_transaction(data: dict) -> Tuple[bool, Optional[str]]:
@@ -440,42 +683,52 @@ def insert_webhook_transaction(data: dict) -> Tuple[bool, Optional[str]]:
     if not doc_id:
         return False, "doc_id is required for webhook transactions"
     
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        
-        # Check if doc_id already exists (deduplication)
-        cursor.execute("SELECT id FROM bank_transactions WHERE doc_id = %s", (doc_id,))
-        existing = cursor.fetchone()
-        if existing:
-            return False, "Document ID already exists"  # Return failure for duplicate
-        
-        # Insert new transaction with gsheet_row = -1
-        insert_sql = """
-            INSERT INTO bank_transactions
-            (booking_date, value_date, doc_id, stan, description, debit, credit, available_balance, gsheet_row)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        params = (
-            data.get("booking_date"),
-            data.get("value_date"),
-            doc_id,
-            data.get("stan"),  # Store STAN in database
-            data.get("description"),
-            data.get("debit"),
-            data.get("credit"),
-            data.get("available_balance"),
-            -1  # Set gsheet_row to -1 for webhook records
-        )
+    with pooled_connection() as conn:
+        try:
+            cursor = conn.cursor()
         
-        cursor.execute(insert_sql, params)
-        conn.commit()
-        return True, None
-    except Exception as exc:
-        conn.rollback()
-        return False, f"Error inserting webhook transaction: {exc}"
-    finally:
-        conn.close()
+            # Insert new transaction with gsheet_row = -1, unless doc_id already
+            # exists (deduplication) - a single round-trip for check and insert
+            insert_sql = """
+                INSERT INTO bank_transactions
+                (booking_date, value_date, doc_id, stan, description, debit, credit, available_balance, gsheet_row)
+                SELECT %s, %s, %s, %s, %s, %s::numeric, %s::numeric, %s::numeric, %s
+                WHERE NOT EXISTS (SELECT 1 FROM bank_transactions WHERE doc_id = %s)
+            """
+            params = (
+                data.get("booking_date"),
+                data.get("value_date"),
+                doc_id,
+                data.get("stan"),  # Store STAN in database
+                data.get("description"),
+                data.get("debit"),
+                data.get("credit"),
+                data.get("available_balance"),
+                -1,  # Set gsheet_row to -1 for webhook records
+                doc_id
+            )
+            
+            cursor.execute(insert_sql, params)
+            if cursor.rowcount == 0:
+                return False, "Document ID already exists"  # Return failure for duplicate
+            
+            conn.commit()
+            return True, None
+        except Exception as exc:
+            conn.rollback()
+            return False, f"Error inserting webhook transaction: {exc}"
+
+
+def _bank_transactions_query(credit_only: bool) -> str:
+    """Build the SELECT used to load bank transactions."""
+    where_clause = "WHERE credit IS NOT NULL AND credit > 0" if credit_only else ""
+    return f"""
+        SELECT id, booking_date, value_date, doc_id, description, 
+               debit, credit, available_balance, gsheet_row
+        FROM bank_transactions 
+        {where_clause}
+        ORDER BY value_date DESC, booking_date DESC
+    """
 
 
 def load_bank_transactions(credit_only: bool = True) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
@@ -489,32 +742,48 @@ def load_bank_transactions(credit_only: bool = True) -> Tuple[Optional[pd.DataFr
         Tuple of (DataFrame with transactions, error message if any)
     """
     try:
-        conn = get_connection()
-        try:
-            if credit_only:
-                query = """
-                    SELECT id, booking_date, value_date, doc_id, description, 
-                           debit, credit, available_balance, gsheet_row
-                    FROM bank_transactions 
-                    WHERE credit IS NOT NULL AND credit > 0
-                    ORDER BY value_date DESC, booking_date DESC
-                """
-            else:
-                query = """
-                    SELECT id, booking_date, value_date, doc_id, description, 
-                           debit, credit, available_balance, gsheet_row
-                    FROM bank_transactions 
-                    ORDER BY value_date DESC, booking_date DESC
-                """
-            
+        with pooled_connection() as conn:
+            query = _bank_transactions_query(credit_only)
             bank_df = pd.read_sql_query(query, conn)
             return bank_df, None
-        finally:
-            conn.close()
     except Exception as e:
         return None, f"Error loading transactions from database: {str(e)}"
 
 
+def iter_bank_transactions(credit_only: bool = True, batch_size: int = 2000) -> Iterator[Dict[str, Any]]:
+    """
+    Stream bank transactions from the database one row at a time.
+    
+    Uses a server-side cursor so rows are fetched in batches of `batch_size`
+    instead of materializing the whole table (or a DataFrame) in memory.
+    Prefer this over load_bank_transactions() when rows are only looped over.
+    
+    Not used by the API itself; provided for scripts and future sync code.
+    The generator holds a pooled connection until it is exhausted or
+    closed, so avoid calling other db helpers inside the loop when the
+    pool may be full.
+    
+    Args:
+        credit_only: If True, only yield transactions with credit > 0 (incoming transfers)
+        batch_size: Number of rows fetched from the server per round-trip
+        
+    Yields:
+        Dictionary with transaction data for each row
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor(name="iter_bank_transactions")
+        try:
+            cursor.itersize = batch_size
+            cursor.execute(_bank_transactions_query(credit_only))
+            columns = None
+            for row in cursor:
+                if columns is None:
+                    columns = [col[0] for col in cursor.description]
+                yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
+
 def search_bank_transactions(
     amount: Optional[float] = None,
     date: Optional[str] = None,
@@ -540,8 +809,7 @@ def search_bank_transactions(
         Tuple of (DataFrame with matching transactions, error message if any)
     """
     try:
-        conn = get_connection()
-        try:
+        with pooled_connection() as conn:
             query = "SELECT * FROM bank_transactions WHERE 1=1"
             params = []
             
@@ -577,12 +845,118 @@ def search_bank_transactions(
             
             bank_df = pd.read_sql_query(query, conn, params=tuple(params) if params else None)
             return bank_df, None
-        finally:
-            conn.close()
     except Exception as e:
         return None, f"Error searching transactions: {str(e)}"
 
 
+_VERIFICATION_RESULT_UPSERT_SQL = """
+    INSERT INTO verification_results 
+    (amount, donor_name, date, transaction_id, status, department, 
+     currency, payment_channel, 
+     checks_passed, checks_failed, timestamp, gsheet_row, donation_id, file_path)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT(transaction_id) DO UPDATE SET
+        amount = EXCLUDED.amount,
+        donor_name = EXCLUDED.donor_name,
+        date = EXCLUDED.date,
+        status = EXCLUDED.status,
+        department = EXCLUDED.department,
+        currency = EXCLUDED.currency,
+        payment_channel = EXCLUDED.payment_channel,
+        checks_passed = EXCLUDED.checks_passed,
+        checks_failed = EXCLUDED.checks_failed,
+        timestamp = EXCLUDED.timestamp,
+        gsheet_row = EXCLUDED.gsheet_row,
+        donation_id = EXCLUDED.donation_id,
+        file_path = EXCLUDED.file_path
+    RETURNING id
+"""
+
+
+def _write_verification_result(
+    cursor,
+    amount: Optional[float],
+    donor_name: str,
+    date: str,
+    transaction_id: Optional[str],
+    status: str,
+    department: Optional[str],
+    currency: str,
+    payment_channel: str,
+    checks_passed: int,
+    checks_failed: int,
+    gsheet_row: Optional[int],
+    donation_id: Optional[str],
+    file_path: Optional[str]
+) -> Optional[int]:
+    """Upsert a verification_results row on an existing cursor and return its ID (no commit)."""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Normalize date to database format
+    normalized_date = normalize_date_to_db_format(date)
+    
+    params = (
+        amount, donor_name, normalized_date, transaction_id, status, department,
+        currency, payment_channel,
+        checks_passed, checks_failed, timestamp, gsheet_row, donation_id, file_path
+    )
+    cursor.execute(_VERIFICATION_RESULT_UPSERT_SQL, params)
+    
+    # Get the ID from RETURNING clause (PostgreSQL doesn't support lastrowid)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _write_screenshot(
+    cursor,
+    verification_id: int,
+    file_path: Optional[str],
+    status: str,
+    gsheet_row: Optional[int]
+) -> Optional[Dict[str, Any]]:
+    """
+    Insert or update the screenshot linked to a verification on an existing cursor (no commit).
+    An already-verified screenshot is returned unchanged.
+    """
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    cursor.execute(
+        "SELECT * FROM screenshots WHERE verification_id = %s LIMIT 1",
+        (verification_id,)
+    )
+    existing = cursor.fetchone()
+
+    if existing:
+        columns = [col[0] for col in cursor.description]
+        existing_dict = dict(zip(columns, existing))
+        if existing_dict.get("status") == "verified":
+            return existing_dict
+
+        cursor.execute(
+            """
+            UPDATE screenshots
+            SET file_path = %s, status = %s, gsheet_row = %s, uploaded_at = %s
+            WHERE verification_id = %s
+            RETURNING *
+            """,
+            (file_path, status, gsheet_row, timestamp, verification_id)
+        )
+    else:
+        cursor.execute(
+            """
+            INSERT INTO screenshots (verification_id, file_path, status, gsheet_row, uploaded_at)
+            VALUES (%s, %s, %s, %s, %s)
+            RETURNING *
+            """,
+            (verification_id, file_path, status, gsheet_row, timestamp)
+        )
+
+    # The written row comes back via RETURNING; no need to query it again
+    row = cursor.fetchone()
+    columns = [col[0] for col in cursor.description]
+    return dict(zip(columns, row)) if row else None
+
+
 def insert_verification_result(
     amount: Optional[float],
     donor_name: str,
@@ -619,62 +993,24 @@ def insert_verification_result(
     Returns:
         Tuple of (success boolean, error message if any, inserted verification ID)
     """
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    # Normalize date to database format
-    normalized_date = normalize_date_to_db_format(date)
-    
-    query = """
-        INSERT INTO verification_results 
-        (amount, donor_name, date, transaction_id, status, department, 
-         currency, payment_channel, 
-         checks_passed, checks_failed, timestamp, gsheet_row, donation_id, file_path)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT(transaction_id) DO UPDATE SET
-            amount = EXCLUDED.amount,
-            donor_name = EXCLUDED.donor_name,
-            date = EXCLUDED.date,
-            status = EXCLUDED.status,
-            department = EXCLUDED.department,
-            currency = EXCLUDED.currency,
-            payment_channel = EXCLUDED.payment_channel,
-            checks_passed = EXCLUDED.checks_passed,
-            checks_failed = EXCLUDED.checks_failed,
-            timestamp = EXCLUDED.timestamp,
-            gsheet_row = EXCLUDED.gsheet_row,
-            donation_id = EXCLUDED.donation_id,
-            file_path = EXCLUDED.file_path
-        RETURNING id
-    """
-    
-    params = (
-        amount, donor_name, normalized_date, transaction_id, status, department,
-        currency, payment_channel,
-        checks_passed, checks_failed, timestamp, gsheet_row, donation_id, file_path
-    )
-    
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        
-        # Get the ID from RETURNING clause (PostgreSQL doesn't support lastrowid)
-        row = cursor.fetchone()
-        verification_id = row[0] if row else None
-        
-        conn.commit()
-        return True, None, verification_id
-    except Exception as e:
-        conn.rollback()
-        return False, f"Error saving verification result: {str(e)}", None
-    finally:
-        conn.close()
+    with pooled_connection() as conn:
+        try:
+            cursor = conn.cursor()
+            verification_id = _write_verification_result(
+                cursor, amount, donor_name, date, transaction_id, status, department,
+                currency, payment_channel, checks_passed, checks_failed,
+                gsheet_row, donation_id, file_path
+            )
+            conn.commit()
+            return True, None, verification_id
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error saving verification result: {str(e)}", None
 
 
 def get_screenshot_by_verification(verification_id: int) -> Optional[Dict[str, Any]]:
     """Return the screenshot metadata for a given verification result."""
-    conn = get_connection()
-    try:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             "SELECT * FROM screenshots WHERE verification_id = %s LIMIT 1",
@@ -685,8 +1021,6 @@ def get_screenshot_by_verification(verification_id: int) -> Optional[Dict[str, A
             return None
         columns = [col[0] for col in cursor.description]
         return dict(zip(columns, row))
-    finally:
-        conn.close()
 
 
 def upsert_screenshot(
@@ -702,55 +1036,63 @@ def upsert_screenshot(
     if not verification_id:
         return False, "Verification ID is required to save screenshot metadata.", None
 
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-        cursor.execute(
-            "SELECT * FROM screenshots WHERE verification_id = %s LIMIT 1",
-            (verification_id,)
-        )
-        existing = cursor.fetchone()
+    with pooled_connection() as conn:
+        try:
+            cursor = conn.cursor()
+            record = _write_screenshot(cursor, verification_id, file_path, status, gsheet_row)
+            conn.commit()
+            return True, None, record
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error saving screenshot record: {str(e)}", None
 
-        if existing:
-            columns = [col[0] for col in cursor.description]
-            existing_dict = dict(zip(columns, existing))
-            if existing_dict.get("status") == "verified":
-                return True, None, existing_dict
 
-            cursor.execute(
-                """
-                UPDATE screenshots
-                SET file_path = %s, status = %s, gsheet_row = %s, uploaded_at = %s
-                WHERE verification_id = %s
-                """,
-                (file_path, status, gsheet_row, timestamp, verification_id)
-            )
-        else:
-            cursor.execute(
-                """
-                INSERT INTO screenshots (verification_id, file_path, status, gsheet_row, uploaded_at)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-                """,
-                (verification_id, file_path, status, gsheet_row, timestamp)
+def save_verification_with_screenshot(
+    amount: Optional[float],
+    donor_name: str,
+    date: str,
+    transaction_id: Optional[str],
+    status: str,
+    department: Optional[str],
+    currency: str,
+    payment_channel: str,
+    checks_passed: int,
+    checks_failed: int,
+    gsheet_row: Optional[int] = None,
+    donation_id: Optional[str] = None,
+    file_path: Optional[str] = None
+) -> Tuple[bool, Optional[str], Optional[int], Optional[Dict[str, Any]]]:
+    """
+    Save a verification result and its linked screenshot record in a single transaction.
+    
+    Equivalent to insert_verification_result() followed by upsert_screenshot()
+    (the screenshot gets the same status, file_path and gsheet_row), but with
+    one commit instead of two; if either write fails, neither is saved.
+    
+    Args:
+        Same as insert_verification_result()
+        
+    Returns:
+        Tuple of (success boolean, error message if any, verification ID, screenshot record)
+    """
+    with pooled_connection() as conn:
+        try:
+            cursor = conn.cursor()
+            verification_id = _write_verification_result(
+                cursor, amount, donor_name, date, transaction_id, status, department,
+                currency, payment_channel, checks_passed, checks_failed,
+                gsheet_row, donation_id, file_path
             )
-
-        conn.commit()
-        cursor.execute(
-            "SELECT * FROM screenshots WHERE verification_id = %s LIMIT 1",
-            (verification_id,)
-        )
-        row = cursor.fetchone()
-        columns = [col[0] for col in cursor.description]
-        record = dict(zip(columns, row)) if row else None
-        return True, None, record
-    except Exception as e:
-        conn.rollback()
-        return False, f"Error saving screenshot record: {str(e)}", None
-    finally:
-        conn.close()
+            if not verification_id:
+                conn.rollback()
+                return False, "Verification ID is required to save screenshot metadata.", None, None
+            
+            screenshot = _write_screenshot(cursor, verification_id, file_path, status, gsheet_row)
+            conn.commit()
+            return True, None, verification_id, screenshot
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error saving verification with screenshot: {str(e)}", None, None
 
 
 def insert_screenshot_inbox(
@@ -767,31 +1109,29 @@ def insert_screenshot_inbox(
     Returns:
         Tuple of (success boolean, error_message if any, inserted screenshot ID)
     """
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
+    with pooled_connection() as conn:
+        try:
+            cursor = conn.cursor()
         
-        # Insert new screenshot record with only donation_id and file_path
-        cursor.execute(
-            """
-            INSERT INTO screenshots 
-            (donation_id, file_path)
-            VALUES (%s, %s)
-            RETURNING id
-            """,
-            (donation_id, file_path)
-        )
+            # Insert new screenshot record with only donation_id and file_path
+            cursor.execute(
+                """
+                INSERT INTO screenshots 
+                (donation_id, file_path)
+                VALUES (%s, %s)
+                RETURNING id
+                """,
+                (donation_id, file_path)
+            )
         
-        row = cursor.fetchone()
-        screenshot_id = row[0] if row else None
+            row = cursor.fetchone()
+            screenshot_id = row[0] if row else None
         
-        conn.commit()
-        return True, None, screenshot_id
-    except Exception as e:
-        conn.rollback()
-        return False, f"Error inserting screenshot inbox record: {str(e)}", None
-    finally:
-        conn.close()
+            conn.commit()
+            return True, None, screenshot_id
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error inserting screenshot inbox record: {str(e)}", None
 
 
 def update_screenshot_status(
@@ -815,46 +1155,43 @@ def update_screenshot_status(
     if not screenshot_id and not donation_id:
         return False, "Either screenshot_id or donation_id must be provided"
     
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
+    with pooled_connection() as conn:
+        try:
+            cursor = conn.cursor()
         
-        # Build update query based on whether verification_id is provided
-        if verification_id is not None:
-            if screenshot_id:
-                cursor.execute(
-                    "UPDATE screenshots SET status = %s, verification_id = %s WHERE id = %s",
-                    (status, verification_id, screenshot_id)
-                )
-            else:
-                cursor.execute(
-                    "UPDATE screenshots SET status = %s, verification_id = %s WHERE donation_id = %s",
-                    (status, verification_id, donation_id)
-                )
-        else:
-            # Only update status if verification_id is not provided
-            if screenshot_id:
-                cursor.execute(
-                    "UPDATE screenshots SET status = %s WHERE id = %s",
-                    (status, screenshot_id)
-                )
+            # Build update query based on whether verification_id is provided
+            if verification_id is not None:
+                if screenshot_id:
+                    cursor.execute(
+                        "UPDATE screenshots SET status = %s, verification_id = %s WHERE id = %s",
+                        (status, verification_id, screenshot_id)
+                    )
+                else:
+                    cursor.execute(
+                        "UPDATE screenshots SET status = %s, verification_id = %s WHERE donation_id = %s",
+                        (status, verification_id, donation_id)
+                    )
             else:
-                cursor.execute(
-                    "UPDATE screenshots SET status = %s WHERE donation_id = %s",
-                    (status, donation_id)
-                )
+                # Only update status if verification_id is not provided
+                if screenshot_id:
+                    cursor.execute(
+                        "UPDATE screenshots SET status = %s WHERE id = %s",
+                        (status, screenshot_id)
+                    )
+                else:
+                    cursor.execute(
+                        "UPDATE screenshots SET status = %s WHERE donation_id = %s",
+                        (status, donation_id)
+                    )
         
-        if cursor.rowcount == 0:
-            conn.close()
-            return False, "No screenshot record found to update"
+            if cursor.rowcount == 0:
+                return False, "No screenshot record found to update"
         
-        conn.commit()
-        conn.close()
-        return True, None
-    except Exception as e:
-        conn.rollback()
-        conn.close()
-        return False, f"Error updating screenshot status: {str(e)}"
+            conn.commit()
+            return True, None
+        except Exception as e:
+            conn.rollback()
+            return False, f"Error updating screenshot status: {str(e)}"
 
 
 def get_verification_results(
@@ -876,8 +1213,7 @@ def get_verification_results(
         Tuple of (DataFrame with verification results, error message if any)
     """
     try:
-        conn = get_connection()
-        try:
+        with pooled_connection() as conn:
             query = "SELECT * FROM verification_results WHERE 1=1"
             params = []
             
@@ -900,8 +1236,6 @@ def get_verification_results(
             
             results_df = pd.read_sql_query(query, conn, params=tuple(params) if params else None)
             return results_df, None
-        finally:
-            conn.close()
     except Exception as e:
         return None, f"Error loading verification results: {str(e)}"
 
@@ -917,8 +1251,7 @@ def get_transaction_by_id(transaction_id: int) -> Optional[Dict[str, Any]]:
         Dictionary with transaction data or None if not found
     """
     try:
-        conn = get_connection()
-        try:
+        with pooled_connection() as conn:
             query = "SELECT * FROM bank_transactions WHERE id = %s"
             cursor = conn.cursor()
             cursor.execute(query, (transaction_id,))
@@ -928,8 +1261,6 @@ def get_transaction_by_id(transaction_id: int) -> Optional[Dict[str, Any]]:
                 columns = [description[0] for description in cursor.description]
                 return dict(zip(columns, row))
             return None
-        finally:
-            conn.close()
     except Exception as e:
         return None
 
@@ -945,8 +1276,7 @@ def get_verification_result_by_id(result_id: int) -> Optional[Dict[str, Any]]:
         Dictionary with verification result data or None if not found
     """
     try:
-        conn = get_connection()
-        try:
+        with pooled_connection() as conn:
             query = "SELECT * FROM verification_results WHERE id = %s"
             cursor = conn.cursor()
             cursor.execute(query, (result_id,))
@@ -956,8 +1286,6 @@ def get_verification_result_by_id(result_id: int) -> Optional[Dict[str, Any]]:
                 columns = [description[0] for description in cursor.description]
                 return dict(zip(columns, row))
             return None
-        finally:
-            conn.close()
     except Exception as e:
         return None
 
@@ -970,14 +1298,11 @@ def get_transaction_count() -> int:
         Total number of transactions in the database
     """
     try:
-        conn = get_connection()
-        try:
+        with pooled_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM bank_transactions")
             count = cursor.fetchone()[0]
             return count
-        finally:
-            conn.close()
     except Exception as e:
         return 0
 
@@ -993,8 +1318,7 @@ def get_verification_count(status: Optional[str] = None) -> int:
         Total number of verification results (optionally filtered by status)
     """
     try:
-        conn = get_connection()
-        try:
+        with pooled_connection() as conn:
             cursor = conn.cursor()
             
             if status:
@@ -1004,8 +1328,6 @@ def get_verification_count(status: Optional[str] = None) -> int:
             
             count = cursor.fetchone()[0]
             return count
-        finally:
-            conn.close()
     except Exception as e:
         return 0
 
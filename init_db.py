@@ -13,6 +13,7 @@ Environment Variables:
 
 import os
 import sys
+from urllib.parse import urlsplit, urlunsplit
 
 try:
     from dotenv import load_dotenv
@@ -20,61 +21,98 @@ try:
 except ImportError:
     pass
 
-try:
-    import db
-except ImportError:
-    print("❌ Error: Could not import db module")
-    print("   Make sure you're running this from the project root directory")
-    sys.exit(1)
+# Environment variables read once at import (after .env has been loaded)
+_ENV = {
+    name: os.environ.get(name)
+    for name in ("DATABASE_URL", "DB_HOST", "DB_NAME", "DB_USER", "DB_PASSWORD")
+}
+
+
+def _mask_password(database_url: str) -> str:
+    """Return the connection URL with its password (if any) replaced by ***."""
+    parts = urlsplit(database_url)
+    if parts.password is None:
+        return database_url
+    userinfo, _, hostport = parts.netloc.rpartition("@")
+    username = userinfo.partition(":")[0]
+    return urlunsplit(parts._replace(netloc=f"{username}:***@{hostport}"))
+
+
+def _write_lines(lines):
+    """Write a block of status lines to stdout with a single write call."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def main():
     """Initialize database schema."""
-    print("=" * 60)
-    print("Database Initialization Script")
-    print("=" * 60)
+    lines = [
+        "=" * 60,
+        "Database Initialization Script",
+        "=" * 60,
+    ]
     
     # Check if DATABASE_URL is set
-    database_url = os.getenv("DATABASE_URL")
+    database_url = _ENV["DATABASE_URL"]
     if database_url:
-        print(f"✅ Found DATABASE_URL")
+        lines.append("✅ Found DATABASE_URL")
         # Mask password in output
         if "@" in database_url:
-            masked_url = database_url.split("@")[0].split(":")[0] + ":***@" + "@".join(database_url.split("@")[1:])
-            print(f"   Connection: {masked_url}")
+            lines.append(f"   Connection: {_mask_password(database_url)}")
     else:
-        print("⚠️  DATABASE_URL not found, using individual DB_* variables")
-        db_host = os.getenv("DB_HOST", "localhost")
-        db_name = os.getenv("DB_NAME", "alkhidmat")
-        db_user = os.getenv("DB_USER", "postgres")
-        print(f"   Host: {db_host}")
-        print(f"   Database: {db_name}")
-        print(f"   User: {db_user}")
+        lines.append("⚠️  DATABASE_URL not found, using individual DB_* variables")
+        db_host = _ENV["DB_HOST"] or "localhost"
+        db_name = _ENV["DB_NAME"] or "alkhidmat"
+        db_user = _ENV["DB_USER"] or "postgres"
+        lines.append(f"   Host: {db_host}")
+        lines.append(f"   Database: {db_name}")
+        lines.append(f"   User: {db_user}")
     
-    print("\nInitializing database schema...")
+    # Show the connection settings before paying for the psycopg2/pandas
+    # imports, which is why db is imported only here
+    _write_lines(lines)
+    try:
+        import db
+    except ImportError:
+        _write_lines([
+            "❌ Error: Could not import db module",
+            "   Make sure you're running this from the project root directory",
+        ])
+        sys.exit(1)
     
     try:
-        db.initialize_schema()
-        print("\n" + "=" * 60)
-        print("✅ Database schema initialized successfully!")
-        print("=" * 60)
-        print("\nTables created:")
-        print("  - sync_metadata")
-        print("  - bank_transactions")
-        print("  - verification_results")
-        print("  - screenshots")
-        print("\nAll indexes and constraints have been set up.")
+        _write_lines(["\nConnecting to database..."])
+        # A one-shot script needs a single connection, not the shared pool
+        conn = db.get_connection()
+        try:
+            _write_lines(["\nInitializing database schema..."])
+            db.initialize_schema(conn)
+        finally:
+            conn.close()
+        _write_lines([
+            "\n" + "=" * 60,
+            "✅ Database schema initialized successfully!",
+            "=" * 60,
+            "\nTables created:",
+            "  - sync_metadata",
+            "  - bank_transactions",
+            "  - verification_results",
+            "  - screenshots",
+            "\nAll indexes and constraints have been set up.",
+        ])
         sys.exit(0)
     except Exception as e:
-        print("\n" + "=" * 60)
-        print("❌ Error initializing database schema")
-        print("=" * 60)
-        print(f"\nError: {str(e)}")
-        print("\nTroubleshooting:")
-        print("  1. Check that DATABASE_URL or DB_* variables are set correctly")
-        print("  2. Verify database is running and accessible")
-        print("  3. Ensure database user has CREATE TABLE permissions")
-        print("  4. Check database connection logs for more details")
+        _write_lines([
+            "\n" + "=" * 60,
+            "❌ Error initializing database schema",
+            "=" * 60,
+            f"\nError: {str(e)}",
+            "\nTroubleshooting:",
+            "  1. Check that DATABASE_URL or DB_* variables are set correctly",
+            "  2. Verify database is running and accessible",
+            "  3. Ensure database user has CREATE TABLE permissions",
+            "  4. Check database connection logs for more details",
+        ])
         sys.exit(1)
 
 
@@ -32,7 +32,6 @@ import logging
 
 try:
     import psycopg2
-    from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 except ImportError:
     print("❌ Error: psycopg2 is not installed.")
     print("   Install it with: pip install psycopg2-binary")
@@ -161,57 +160,41 @@ def execute_migration(sql_content: str, conn) -> bool:
         bool: True if migration succeeded, False otherwise
     """
     try:
-        # Set isolation level to autocommit for DDL statements
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        # Run the whole script in one transaction: a single commit, and a
+        # failure part-way through leaves no partially applied DDL behind
+        # (none of the statements require autocommit, e.g. CREATE INDEX CONCURRENTLY)
         cursor = conn.cursor()
         
         logger.info("Executing migration SQL...")
         
         # Execute the migration SQL
         cursor.execute(sql_content)
+        conn.commit()
         
         logger.info("✅ Migration SQL executed successfully")
         
-        # Verify table was created
+        # Verify table, columns, indexes and triggers in a single round-trip
         cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_name = 'bank_transactions'
-            );
+            SELECT
+                EXISTS (
+                    SELECT FROM information_schema.tables 
+                    WHERE table_schema = 'public' 
+                    AND table_name = 'bank_transactions'
+                ),
+                (SELECT COUNT(*) FROM information_schema.columns 
+                 WHERE table_name = 'bank_transactions'),
+                (SELECT COUNT(*) FROM pg_indexes 
+                 WHERE tablename = 'bank_transactions'),
+                (SELECT COUNT(*) FROM information_schema.triggers 
+                 WHERE event_object_table = 'bank_transactions');
         """)
-        table_exists = cursor.fetchone()[0]
+        table_exists, column_count, index_count, trigger_count = cursor.fetchone()
         
         if table_exists:
             logger.info("✅ Verified: bank_transactions table exists")
-            
-            # Check columns
-            cursor.execute("""
-                SELECT column_name, data_type 
-                FROM information_schema.columns 
-                WHERE table_name = 'bank_transactions'
-                ORDER BY ordinal_position;
-            """)
-            columns = cursor.fetchall()
-            logger.info(f"✅ Table has {len(columns)} columns")
-            
-            # Check indexes
-            cursor.execute("""
-                SELECT indexname 
-                FROM pg_indexes 
-                WHERE tablename = 'bank_transactions';
-            """)
-            indexes = cursor.fetchall()
-            logger.info(f"✅ Found {len(indexes)} indexes")
-            
-            # Check triggers
-            cursor.execute("""
-                SELECT trigger_name 
-                FROM information_schema.triggers 
-                WHERE event_object_table = 'bank_transactions';
-            """)
-            triggers = cursor.fetchall()
-            logger.info(f"✅ Found {len(triggers)} triggers")
+            logger.info(f"✅ Table has {column_count} columns")
+            logger.info(f"✅ Found {index_count} indexes")
+            logger.info(f"✅ Found {trigger_count} triggers")
         else:
             logger.warning("⚠️  Warning: bank_transactions table not found after migration")
         
@@ -219,11 +202,13 @@ def execute_migration(sql_content: str, conn) -> bool:
         return True
         
     except psycopg2.Error as e:
+        conn.rollback()
         logger.error(f"❌ Database error during migration: {e}")
         logger.error(f"   Error code: {e.pgcode if hasattr(e, 'pgcode') else 'N/A'}")
         logger.error(f"   Error message: {e.pgerror if hasattr(e, 'pgerror') else str(e)}")
         return False
     except Exception as e:
+        conn.rollback()
         logger.error(f"❌ Unexpected error during migration: {e}")
         logger.exception("Full traceback:")
         return False
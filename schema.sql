@@ -0,0 +1,66 @@
+-- Application schema used by db.initialize_schema()
+-- Every statement is idempotent; the whole file is executed as one batch
+
+-- Sync metadata (last Google Sheet sync time, etc.)
+CREATE TABLE IF NOT EXISTS sync_metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Bank transactions (Google Sheet rows and webhook alerts)
+CREATE TABLE IF NOT EXISTS bank_transactions (
+    id SERIAL PRIMARY KEY,
+    booking_date TEXT,
+    value_date TEXT,
+    doc_id TEXT,
+    stan TEXT,
+    description TEXT,
+    debit NUMERIC(15, 2),
+    credit NUMERIC(15, 2),
+    available_balance NUMERIC(15, 2),
+    gsheet_row INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_bank_transactions_doc_id
+ON bank_transactions(doc_id);
+
+-- Verification results
+CREATE TABLE IF NOT EXISTS verification_results (
+    id SERIAL PRIMARY KEY,
+    amount NUMERIC(15, 2),
+    donor_name TEXT,
+    date TEXT,
+    transaction_id TEXT UNIQUE,
+    status TEXT,
+    department TEXT,
+    currency TEXT,
+    payment_channel TEXT,
+    checks_passed INTEGER,
+    checks_failed INTEGER,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    gsheet_row INTEGER,
+    donation_id TEXT,
+    file_path TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_verification_results_transaction_id
+ON verification_results(transaction_id);
+
+-- Screenshots
+CREATE TABLE IF NOT EXISTS screenshots (
+    id SERIAL PRIMARY KEY,
+    verification_id INTEGER,
+    donation_id TEXT,
+    file_path TEXT,
+    status TEXT,
+    uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    gsheet_row INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_screenshots_verification_id
+ON screenshots(verification_id);
+
+CREATE INDEX IF NOT EXISTS idx_screenshots_donation_id
+ON screenshots(donation_id);